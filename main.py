@@ -1,76 +1,216 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from scipy.stats import norm
+from numba import njit
 import yfinance as yf
-import matplotlib.pyplot as plt
+from math import erfc, sqrt, log
 from datetime import datetime, timedelta
 
 
+# Stock price moves shown in the scenario section of the report
+SCENARIO_SHOCKS = np.array([0.20, 0.10, 0.0, -0.10, -0.20])
+
+
+@njit("float64(float64)", cache=True)
+def _norm_cdf(x):
+    """Standard normal CDF (erfc form stays accurate deep in the lower tail)"""
+    return 0.5 * erfc(-x / sqrt(2.0))
+
+
+@njit("UniTuple(float64, 5)(float64[:])", cache=True)
+def _stats(close):
+    """Mean, std, mean absolute value, max and min of daily log returns in one pass"""
+    n = close.shape[0] - 1
+    if n < 1:
+        # Fewer than two closes: no returns to summarize
+        return np.nan, np.nan, np.nan, np.nan, np.nan
+    s = 0.0
+    ss = 0.0
+    ab = 0.0
+    mx = -np.inf
+    mn = np.inf
+    for i in range(1, n + 1):
+        r = log(close[i] / close[i - 1])
+        s += r
+        ss += r * r
+        ab += abs(r)
+        if r > mx:
+            mx = r
+        if r < mn:
+            mn = r
+    mean = s / n
+    return mean, sqrt(max(ss / n - mean * mean, 0.0)), ab / n, mx, mn
+
+
+@njit("float64[:](float64[:], float64, float64, float64, boolean)", cache=True)
+def _prob_profit(strikes, current_price, volatility, time_to_expiry, is_call):
+    """Probability of finishing in the money for each strike"""
+    prob_profit = np.empty(strikes.shape[0])
+    std_dev = volatility * sqrt(time_to_expiry)
+    if std_dev == 0.0:
+        # Expiring today or flat history: the outcome is already decided
+        for i in range(strikes.shape[0]):
+            in_the_money = current_price > strikes[i] if is_call else current_price < strikes[i]
+            prob_profit[i] = 1.0 if in_the_money else 0.0
+        return prob_profit
+
+    # Using 1 - N(z) == N(-z), calls and puts differ only by the sign of z
+    sign = -1.0 if is_call else 1.0
+    scale = sign / std_dev
+    log_current = log(current_price)
+    for i in range(strikes.shape[0]):
+        prob_profit[i] = _norm_cdf((log(strikes[i]) - log_current) * scale)
+    return prob_profit
+
+
+class PricingContext:
+    """Strike- and expiry-independent statistics for one ticker's price history"""
+
+    def __init__(self, ticker, price_history):
+        self.ticker = ticker
+        self.price_history = price_history
+        # Writable copy: pandas may hand out read-only views, which don't
+        # match the compiled kernel signatures. Missing closes are dropped,
+        # as pct_change().dropna() used to do.
+        close = np.array(price_history['Close'], dtype=np.float64)
+        self.close = close[np.isfinite(close)]
+        self.current_price = self.close[-1]
+        _, daily_std, self.avg_daily_move, self.max_daily_gain, self.max_daily_loss = _stats(self.close)
+        self.volatility = daily_std * sqrt(252.0)
+
+    def prob_profit(self, strike_price, days_to_expiry, option_type='call'):
+        """Probability of profit for a scalar strike or an array of strikes"""
+        # Writable copy (see __init__); strike grids are flattened for the
+        # 1-D kernel and the result reshaped to match
+        strikes = np.array(strike_price, dtype=np.float64, ndmin=1)
+        prob_profit = _prob_profit(strikes.ravel(), self.current_price, self.volatility,
+                                   days_to_expiry / 365.0, option_type == 'call')
+        if np.ndim(strike_price) == 0:
+            return prob_profit[0]
+        return prob_profit.reshape(strikes.shape)
+
+
 class ComprehensiveOptionsAnalyzer:
     def __init__(self):
         self.risk_free_rate = 0.05
-
-    def analyze_option(self, ticker, strike_price, days_to_expiry, option_type='call', investment_amount=1000):
-        """Analyze an option with comprehensive metrics"""
+        self._ticker_cache = {}
+        self._hist_cache = {}
+        self._context_cache = {}
+        # Moneyness grid for the profit/loss chart, rescaled by the current price
+        self._m_grid = np.linspace(0.7, 1.3, 100)
+
+    def get_history(self, ticker, period='3mo'):
+        """Fetch price history, reusing cached Ticker objects and downloads"""
+        key = (ticker, period)
+        if key not in self._hist_cache:
+            if ticker not in self._ticker_cache:
+                self._ticker_cache[ticker] = yf.Ticker(ticker)
+            # Only daily closes are used, so skip dividend/split columns and
+            # pre/post-market bars
+            self._hist_cache[key] = self._ticker_cache[ticker].history(
+                period=period, interval='1d', actions=False, prepost=False)
+        return self._hist_cache[key]
+
+    def get_context(self, ticker, period='3mo'):
+        """Return the cached PricingContext for a ticker, building it on first use"""
+        key = (ticker, period)
+        if key not in self._context_cache:
+            self._context_cache[key] = PricingContext(ticker, self.get_history(ticker, period))
+        return self._context_cache[key]
+
+    def analyze_option(self, ticker, strike_price, days_to_expiry, option_type='call', investment_amount=1000,
+                       plot=True, savepath=None):
+        """Analyze an option with comprehensive metrics
+
+        strike_price may be a scalar or an array of strikes; for an array,
+        'prob_profit' in the result holds one value per strike. Pass
+        plot=False to skip the charts (and the matplotlib import), or a
+        savepath to write them to a file instead of showing them.
+        """
         print(f"\nAnalyzing {ticker} {option_type} option...")
 
-        # Get stock data
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period='3mo')
-        current_price = hist['Close'].iloc[-1]
-
-        # Calculate price movement statistics
-        daily_returns = hist['Close'].pct_change().dropna()
-        volatility = daily_returns.std() * np.sqrt(252)
-        avg_daily_move = abs(daily_returns).mean()
-        max_daily_gain = daily_returns.max()
-        max_daily_loss = daily_returns.min()
-
-        # Calculate probability metrics
-        time_to_expiry = days_to_expiry / 365.0
-        std_dev = volatility * np.sqrt(time_to_expiry)
-        if option_type == 'call':
-            prob_profit = 1 - norm.cdf(np.log(strike_price / current_price) / std_dev)
-        else:
-            prob_profit = norm.cdf(np.log(strike_price / current_price) / std_dev)
+        # Get stock data and its strike-independent statistics
+        context = self.get_context(ticker)
 
         # Create analysis results
         analysis = {
             'ticker': ticker,
-            'current_price': current_price,
+            'current_price': context.current_price,
             'strike_price': strike_price,
             'days_to_expiry': days_to_expiry,
-            'volatility': volatility,
-            'avg_daily_move': avg_daily_move,
-            'max_daily_gain': max_daily_gain,
-            'max_daily_loss': max_daily_loss,
-            'prob_profit': prob_profit,
+            'volatility': context.volatility,
+            'avg_daily_move': context.avg_daily_move,
+            'max_daily_gain': context.max_daily_gain,
+            'max_daily_loss': context.max_daily_loss,
+            'prob_profit': context.prob_profit(strike_price, days_to_expiry, option_type),
             'investment_amount': investment_amount,
             'option_type': option_type
         }
 
         # Plot analysis
-        self.plot_comprehensive_analysis(analysis, hist)
+        if plot:
+            self.plot_comprehensive_analysis(analysis, context.price_history, savepath=savepath)
 
         return analysis
 
-    def plot_comprehensive_analysis(self, analysis, price_history):
-        """Create comprehensive visualizations"""
+    def analyze_many(self, specs, max_workers=16):
+        """Analyze several options, downloading each distinct ticker concurrently
+
+        specs is a sequence of tuples (ticker, strike_price, days_to_expiry[,
+        option_type[, investment_amount]]). Results come back in spec order;
+        charts are skipped.
+        """
+        specs = list(specs)
+        for spec in specs:
+            if not 3 <= len(spec) <= 5:
+                raise ValueError(f"Expected (ticker, strike_price, days_to_expiry[, option_type"
+                                 f"[, investment_amount]]), got {spec!r}")
+        tickers = list(dict.fromkeys(spec[0] for spec in specs))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.get_context, tickers))
+
+        results = []
+        for spec in specs:
+            ticker, strike_price, days_to_expiry, *rest = spec
+            option_type = rest[0] if len(rest) > 0 else 'call'
+            investment_amount = rest[1] if len(rest) > 1 else 1000
+            results.append(self.analyze_option(ticker, strike_price, days_to_expiry,
+                                               option_type=option_type,
+                                               investment_amount=investment_amount,
+                                               plot=False))
+        return results
+
+    def plot_comprehensive_analysis(self, analysis, price_history, savepath=None):
+        """Create comprehensive visualizations
+
+        Set BATCH=1 in the environment to render headless with the Agg backend.
+        """
+        import matplotlib
+        if os.environ.get('BATCH') == '1':
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
 
+        current_price = analysis['current_price']
+        strikes = np.ravel(analysis['strike_price'])
+        call = analysis['option_type'] == 'call'
+
         # Plot 1: Price History and Zones
         ax1.plot(price_history.index, price_history['Close'], 'b-', label='Stock Price')
-        ax1.axhline(y=analysis['strike_price'], color='r', linestyle='--',
-                    label=f'Strike Price (${analysis["strike_price"]:.2f})')
-        ax1.plot(price_history.index[-1], analysis['current_price'], 'go', markersize=10,
-                 label=f'Current Price (${analysis["current_price"]:.2f})')
-
-        # Add profit/loss zones
-        if analysis['option_type'] == 'call':
-            ax1.fill_between(price_history.index, analysis['strike_price'], ax1.get_ylim()[1],
-                             alpha=0.1, color='g', label='Profit Zone')
+        for strike in strikes:
+            ax1.axhline(y=strike, color='r', linestyle='--',
+                        label=f'Strike Price (${strike:.2f})')
+        ax1.plot(price_history.index[-1], current_price, 'go', markersize=10,
+                 label=f'Current Price (${current_price:.2f})')
+
+        # Add profit/loss zones (relative to the most favourable strike)
+        y_low, y_high = ax1.get_ylim()
+        if call:
+            ax1.axhspan(strikes.min(), y_high, alpha=0.1, color='g', label='Profit Zone')
         else:
-            ax1.fill_between(price_history.index, ax1.get_ylim()[0], analysis['strike_price'],
-                             alpha=0.1, color='g', label='Profit Zone')
+            ax1.axhspan(y_low, strikes.max(), alpha=0.1, color='g', label='Profit Zone')
+        ax1.set_ylim(y_low, y_high)
 
         ax1.set_title('Stock Price History and Profit Zones', fontsize=12)
         ax1.set_xlabel('Date')
@@ -79,21 +219,16 @@ class ComprehensiveOptionsAnalyzer:
         ax1.legend()
 
         # Plot 2: Profit/Loss Scenarios
-        price_range = np.linspace(analysis['current_price'] * 0.7,
-                                  analysis['current_price'] * 1.3, 100)
-        if analysis['option_type'] == 'call':
-            profit = np.maximum(price_range - analysis['strike_price'], 0) - \
-                     (analysis['current_price'] - analysis['strike_price'])
-        else:
-            profit = np.maximum(analysis['strike_price'] - price_range, 0) - \
-                     (analysis['strike_price'] - analysis['current_price'])
+        price_range = self._m_grid * current_price
+        for strike in strikes:
+            current_value = (current_price - strike) if call else (strike - current_price)
+            profit = _intrinsic(price_range, strike, call) - current_value
+            ax2.plot(price_range, profit, label=f'Profit/Loss (K=${strike:.2f})')
+            ax2.axvline(x=strike, color='r', linestyle='--', alpha=0.5)
 
-        ax2.plot(price_range, profit, 'b-', label='Profit/Loss')
         ax2.axhline(y=0, color='k', linestyle='-', alpha=0.3)
-        ax2.axvline(x=analysis['current_price'], color='g', linestyle='--',
+        ax2.axvline(x=current_price, color='g', linestyle='--',
                     label='Current Price')
-        ax2.axvline(x=analysis['strike_price'], color='r', linestyle='--',
-                    label='Strike Price')
 
         ax2.set_title('Potential Profit/Loss Scenarios', fontsize=12)
         ax2.set_xlabel('Stock Price at Expiration ($)')
@@ -102,95 +237,113 @@ class ComprehensiveOptionsAnalyzer:
         ax2.legend()
 
         plt.tight_layout()
-        plt.show()
+        if savepath is not None:
+            fig.savefig(savepath)
+        else:
+            plt.show()
+        plt.close(fig)
+
+
+def _intrinsic(price, strike, call):
+    """Intrinsic value per share of a call or put at the given stock price(s)"""
+    return np.maximum(price - strike, 0.0) if call else np.maximum(strike - price, 0.0)
 
 
 def explain_analysis(analysis):
     """Provide comprehensive explanation in plain English"""
-    explanation = "\n=== COMPREHENSIVE OPTION ANALYSIS ===\n"
+    current_price = analysis['current_price']
+    # A strike array (option chain) gets one line per strike in the
+    # strike-dependent sections
+    strikes = np.ravel(analysis['strike_price'])
+    probs = np.ravel(analysis['prob_profit'])
+    multi = strikes.size > 1
+    days_to_expiry = analysis['days_to_expiry']
+    volatility = analysis['volatility']
+    call = analysis['option_type'] == 'call'
+
+    parts = ["", "=== COMPREHENSIVE OPTION ANALYSIS ==="]
 
     # 1. Basic Information
-    explanation += "\n🔍 BASIC INFORMATION:\n"
-    explanation += f"Stock: {analysis['ticker']}\n"
-    explanation += f"Current Stock Price: ${analysis['current_price']:.2f}\n"
-    explanation += f"Strike Price: ${analysis['strike_price']:.2f}\n"
-    explanation += f"Days until Expiration: {analysis['days_to_expiry']}\n"
-    explanation += f"Option Type: {analysis['option_type'].upper()}\n"
+    parts.append("")
+    parts.append("🔍 BASIC INFORMATION:")
+    parts.append(f"Stock: {analysis['ticker']}")
+    parts.append(f"Current Stock Price: ${current_price:.2f}")
+    parts.append("Strike Price: " + ", ".join(f"${strike:.2f}" for strike in strikes))
+    parts.append(f"Days until Expiration: {days_to_expiry}")
+    parts.append(f"Option Type: {analysis['option_type'].upper()}")
 
     # 2. Position Status
-    explanation += "\n📊 POSITION STATUS:\n"
-    if analysis['option_type'] == 'call':
-        if analysis['current_price'] > analysis['strike_price']:
-            explanation += "✅ IN THE MONEY: The stock price is above your strike price\n"
-            explanation += f"   You're currently up ${analysis['current_price'] - analysis['strike_price']:.2f} per share\n"
-        else:
-            explanation += "⚠️ OUT OF THE MONEY: The stock price is below your strike price\n"
-            explanation += f"   You need the stock to rise ${analysis['strike_price'] - analysis['current_price']:.2f} to break even\n"
-    else:
-        if analysis['current_price'] < analysis['strike_price']:
-            explanation += "✅ IN THE MONEY: The stock price is below your strike price\n"
-            explanation += f"   You're currently up ${analysis['strike_price'] - analysis['current_price']:.2f} per share\n"
+    parts.append("")
+    parts.append("📊 POSITION STATUS:")
+    for strike in strikes:
+        if multi:
+            parts.append(f"Strike ${strike:.2f}:")
+        moneyness = (current_price - strike) if call else (strike - current_price)
+        if moneyness > 0:
+            parts.append(f"✅ IN THE MONEY: The stock price is {'above' if call else 'below'} your strike price")
+            parts.append(f"   You're currently up ${moneyness:.2f} per share")
         else:
-            explanation += "⚠️ OUT OF THE MONEY: The stock price is above your strike price\n"
-            explanation += f"   You need the stock to fall ${analysis['current_price'] - analysis['strike_price']:.2f} to break even\n"
+            parts.append(f"⚠️ OUT OF THE MONEY: The stock price is {'below' if call else 'above'} your strike price")
+            parts.append(f"   You need the stock to {'rise' if call else 'fall'} ${abs(moneyness):.2f} to break even")
 
     # 3. Risk Assessment
-    explanation += "\n⚠️ RISK ASSESSMENT:\n"
-    explanation += f"Market Volatility: {analysis['volatility']:.1%}\n"
+    parts.append("")
+    parts.append("⚠️ RISK ASSESSMENT:")
+    parts.append(f"Market Volatility: {volatility:.1%}")
 
-    risk_level = "LOW" if analysis['volatility'] < 0.15 else "MEDIUM" if analysis['volatility'] < 0.3 else "HIGH"
-    explanation += f"Risk Level: {risk_level}\n"
+    risk_level = "LOW" if volatility < 0.15 else "MEDIUM" if volatility < 0.3 else "HIGH"
+    parts.append(f"Risk Level: {risk_level}")
 
-    explanation += "\nDaily Price Movements:\n"
-    explanation += f"- Average: {analysis['avg_daily_move']:.1%}\n"
-    explanation += f"- Largest Gain: {analysis['max_daily_gain']:.1%}\n"
-    explanation += f"- Largest Loss: {analysis['max_daily_loss']:.1%}\n"
+    parts.append("")
+    parts.append("Daily Price Movements:")
+    parts.append(f"- Average: {analysis['avg_daily_move']:.1%}")
+    parts.append(f"- Largest Gain: {analysis['max_daily_gain']:.1%}")
+    parts.append(f"- Largest Loss: {analysis['max_daily_loss']:.1%}")
 
     # 4. Profit Potential
-    explanation += "\n💰 PROFIT POTENTIAL:\n"
-    explanation += f"Probability of Profit: {analysis['prob_profit']:.1%}\n"
+    parts.append("")
+    parts.append("💰 PROFIT POTENTIAL:")
+    for strike, prob in zip(strikes, probs):
+        label = f" (K=${strike:.2f})" if multi else ""
+        parts.append(f"Probability of Profit{label}: {prob:.1%}")
 
     # 5. Scenarios
-    explanation += "\n🎯 POSSIBLE SCENARIOS:\n"
-    price_up_10 = analysis['current_price'] * 1.10
-    price_down_10 = analysis['current_price'] * 0.90
-
-    explanation += "If the stock goes up 10%:\n"
-    if analysis['option_type'] == 'call':
-        profit = max(price_up_10 - analysis['strike_price'], 0)
-        explanation += f"- Option would be worth: ${profit:.2f} per share\n"
-    else:
-        profit = max(analysis['strike_price'] - price_up_10, 0)
-        explanation += f"- Option would be worth: ${profit:.2f} per share\n"
-
-    explanation += "\nIf the stock goes down 10%:\n"
-    if analysis['option_type'] == 'call':
-        profit = max(price_down_10 - analysis['strike_price'], 0)
-        explanation += f"- Option would be worth: ${profit:.2f} per share\n"
-    else:
-        profit = max(analysis['strike_price'] - price_down_10, 0)
-        explanation += f"- Option would be worth: ${profit:.2f} per share\n"
+    parts.append("")
+    parts.append("🎯 POSSIBLE SCENARIOS:")
+    prices = current_price * (1 + SCENARIO_SHOCKS)
+    payoff = _intrinsic(prices[:, np.newaxis], strikes, call)
+    for i, (shock, values) in enumerate(zip(SCENARIO_SHOCKS, payoff)):
+        if i:
+            parts.append("")
+        if shock == 0:
+            parts.append("If the stock stays flat:")
+        else:
+            parts.append(f"If the stock goes {'up' if shock > 0 else 'down'} {abs(shock):.0%}:")
+        for strike, value in zip(strikes, values):
+            label = f" (K=${strike:.2f})" if multi else ""
+            parts.append(f"- Option{label} would be worth: ${value:.2f} per share")
 
     # 6. Recommendations
-    explanation += "\n💡 RECOMMENDATIONS:\n"
-    if analysis['days_to_expiry'] < 7:
-        explanation += "⚡ IMMEDIATE ATTENTION NEEDED: Very close to expiration\n"
-    elif analysis['days_to_expiry'] < 30:
-        explanation += "👀 MONITOR CLOSELY: Less than 30 days to expiration\n"
+    parts.append("")
+    parts.append("💡 RECOMMENDATIONS:")
+    if days_to_expiry < 7:
+        parts.append("⚡ IMMEDIATE ATTENTION NEEDED: Very close to expiration")
+    elif days_to_expiry < 30:
+        parts.append("👀 MONITOR CLOSELY: Less than 30 days to expiration")
     else:
-        explanation += "✅ TIME IS ON YOUR SIDE: More than 30 days to expiration\n"
+        parts.append("✅ TIME IS ON YOUR SIDE: More than 30 days to expiration")
 
     if risk_level == "HIGH":
-        explanation += "- Consider using stop losses to manage risk\n"
-        explanation += "- Think about taking partial profits if available\n"
+        parts.append("- Consider using stop losses to manage risk")
+        parts.append("- Think about taking partial profits if available")
     elif risk_level == "MEDIUM":
-        explanation += "- Monitor the position regularly\n"
-        explanation += "- Have a clear exit strategy\n"
+        parts.append("- Monitor the position regularly")
+        parts.append("- Have a clear exit strategy")
     else:
-        explanation += "- Stay within your investment plan\n"
-        explanation += "- Watch for changes in market conditions\n"
+        parts.append("- Stay within your investment plan")
+        parts.append("- Watch for changes in market conditions")
 
-    return explanation
+    return "\n".join(parts) + "\n"
 
 
 def main():
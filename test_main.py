@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.special import ndtr
+
+import main
+
+
+def make_history(close):
+    close = np.asarray(close, dtype=np.float64)
+    return pd.DataFrame({'Close': close},
+                        index=pd.date_range('2026-01-01', periods=len(close)))
+
+
+def random_close(seed=0, n=63):
+    rng = np.random.default_rng(seed)
+    return 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+
+
+class FakeTicker:
+    """Stand-in for yf.Ticker that serves synthetic history and counts calls"""
+    created = []
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        FakeTicker.created.append(ticker)
+
+    def history(self, **kwargs):
+        return make_history(random_close(seed=len(self.ticker)))
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    FakeTicker.created = []
+    monkeypatch.setattr(main.yf, 'Ticker', FakeTicker)
+    return main.ComprehensiveOptionsAnalyzer()
+
+
+def test_pricing_context_matches_reference():
+    close = random_close(seed=3)
+    context = main.PricingContext('XYZ', make_history(close))
+
+    returns = np.diff(np.log(close))
+    np.testing.assert_allclose(context.volatility, returns.std(ddof=0) * np.sqrt(252), rtol=1e-10)
+    np.testing.assert_allclose(context.avg_daily_move, np.abs(returns).mean(), rtol=1e-10)
+    np.testing.assert_allclose(context.max_daily_gain, returns.max(), rtol=1e-10)
+    np.testing.assert_allclose(context.max_daily_loss, returns.min(), rtol=1e-10)
+
+    strikes = close[-1] * np.array([0.8, 0.95, 1.0, 1.05, 1.2])
+    z = np.log(strikes / close[-1]) / (context.volatility * np.sqrt(30 / 365.0))
+    np.testing.assert_allclose(context.prob_profit(strikes, 30, 'call'), 1 - ndtr(z), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(context.prob_profit(strikes, 30, 'put'), ndtr(z), rtol=1e-9, atol=1e-12)
+
+
+def test_pricing_context_skips_missing_closes():
+    close = random_close(seed=3)
+    gappy = close.copy()
+    gappy[20] = np.nan
+    gappy[-1] = np.nan
+    context = main.PricingContext('XYZ', make_history(gappy))
+
+    valid = gappy[np.isfinite(gappy)]
+    returns = np.diff(np.log(valid))
+    assert context.current_price == close[-2]
+    np.testing.assert_allclose(context.volatility, returns.std(ddof=0) * np.sqrt(252), rtol=1e-10)
+    np.testing.assert_allclose(context.max_daily_gain, returns.max(), rtol=1e-10)
+    assert np.isfinite(context.prob_profit(100.0, 30, 'call'))
+
+
+def test_explain_analysis_strike_array(analyzer):
+    analysis = analyzer.analyze_option('XYZ', np.array([95.0, 105.0]), 30, plot=False)
+    report = main.explain_analysis(analysis)
+    assert "Strike Price: $95.00, $105.00" in report
+    assert "Probability of Profit (K=$95.00):" in report
+    assert "Probability of Profit (K=$105.00):" in report
+    assert report.count("- Option (K=$105.00) would be worth:") == len(main.SCENARIO_SHOCKS)
+
+
+def test_explain_analysis_scalar_strike(analyzer):
+    analysis = analyzer.analyze_option('XYZ', 100, 30, plot=False)
+    report = main.explain_analysis(analysis)
+    assert "Strike Price: $100.00\n" in report
+    assert "(K=" not in report
+
+
+@pytest.mark.parametrize('option_type, expected', [('call', [1.0, 0.0, 0.0]), ('put', [0.0, 0.0, 1.0])])
+def test_prob_profit_expiring_today(analyzer, option_type, expected):
+    current_price = analyzer.get_context('XYZ').current_price
+    strikes = current_price + np.array([-5.0, 0.0, 5.0])
+    analysis = analyzer.analyze_option('XYZ', strikes, 0, option_type, plot=False)
+    np.testing.assert_array_equal(analysis['prob_profit'], expected)
+
+
+def test_prob_profit_flat_history():
+    context = main.PricingContext('FLAT', make_history(np.full(20, 50.0)))
+    assert context.volatility == 0.0
+    assert context.prob_profit(40.0, 30, 'call') == 1.0
+    assert context.prob_profit(40.0, 30, 'put') == 0.0
+
+
+def test_stats_single_close():
+    context = main.PricingContext('NEW', make_history([42.0]))
+    assert context.current_price == 42.0
+    assert np.isnan(context.volatility)
+    assert np.isnan(context.avg_daily_move)
+    assert np.isnan(context.prob_profit(40.0, 30, 'call'))
+
+
+def test_prob_profit_readonly_and_grid_strikes(analyzer):
+    strikes = np.array([[95.0, 100.0], [105.0, 110.0]])
+    expected = analyzer.analyze_option('XYZ', strikes.ravel().copy(), 30, plot=False)['prob_profit']
+
+    strikes.flags.writeable = False
+    prob_profit = analyzer.analyze_option('XYZ', strikes, 30, plot=False)['prob_profit']
+    assert prob_profit.shape == (2, 2)
+    np.testing.assert_array_equal(prob_profit.ravel(), expected)
+
+
+def test_analyze_many(analyzer):
+    specs = [('AAA', 100, 30, 'call'), ('BB', 100, 30, 'put'), ('AAA', 90, 60), ('C', 100, 10, 'call', 500)]
+    results = analyzer.analyze_many(specs)
+
+    assert sorted(FakeTicker.created) == ['AAA', 'BB', 'C']
+    assert [(r['ticker'], r['strike_price'], r['days_to_expiry']) for r in results] == \
+        [spec[:3] for spec in specs]
+    assert [r['option_type'] for r in results] == ['call', 'put', 'call', 'call']
+    assert results[3]['investment_amount'] == 500
+
+
+def test_analyze_many_accepts_generator(analyzer):
+    results = analyzer.analyze_many((ticker, 100, 30) for ticker in ['AAA', 'BB', 'AAA'])
+
+    assert [r['ticker'] for r in results] == ['AAA', 'BB', 'AAA']
+    assert sorted(FakeTicker.created) == ['AAA', 'BB']
+
+
+def test_analyze_many_rejects_long_spec(analyzer):
+    with pytest.raises(ValueError):
+        analyzer.analyze_many([('AAA', 100, 30, 'call', 500, True)])